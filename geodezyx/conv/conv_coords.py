@@ -253,10 +253,38 @@ def XYZ2ENU(dX,dY,dZ,lat0,lon0):
     Note
     ----
     This recursive fuction should be improved
+    (only the 1D inputs of the same size are vectorized)
     """
     
     ## Case one ref point per dXYZ
     if utils.is_iterable(lat0):
+        try:
+            Inp = [np.asarray(e,dtype=np.float64) for e in (dX,dY,dZ,lat0,lon0)]
+            vectorizable = all([e.ndim == 1 and len(e) == len(Inp[0]) for e in Inp])
+        except (ValueError,TypeError): # ragged inputs
+            vectorizable = False
+
+        ## 1D inputs of the same size: one rotation matrix per point,
+        ## all applied at once
+        if vectorizable:
+            dXar,dYar,dZar,f0,l0 = Inp
+            f0 = np.deg2rad(f0)
+            l0 = np.deg2rad(l0)
+
+            sf0 , cf0 = np.sin(f0) , np.cos(f0)
+            sl0 , cl0 = np.sin(l0) , np.cos(l0)
+
+            R = np.stack((np.stack((-sl0 , cl0 , np.zeros_like(l0)),axis=-1),
+                          np.stack((-sf0*cl0 , -sf0*sl0 , cf0),axis=-1),
+                          np.stack((cf0*cl0 , cf0*sl0 , sf0),axis=-1)),axis=-2)
+
+            enu = np.einsum('nij,nj->ni',R,np.column_stack((dXar,dYar,dZar)))
+
+            return np.squeeze(enu[:,0]) , \
+                   np.squeeze(enu[:,1]) , \
+                   np.squeeze(enu[:,2])
+
+        ## other shapes: recursion on the elements
         E,N,U = [] , [] , []
         for dX_m,dY_m,dZ_m,lat0_m,lon0_m in zip(dX,dY,dZ,lat0,lon0):
             E_m , N_m , U_m = XYZ2ENU(dX_m,dY_m,dZ_m,lat0_m,lon0_m)
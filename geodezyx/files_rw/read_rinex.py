@@ -6,6 +6,10 @@
 This sub-module of geodezyx.files_rw contains functions to 
 read RINEX files observation files.
 
+The observation records are parsed at once by the vectorized 
+fixed-width decoder _obs_records_decode, which is the only 
+parser of the observation values.
+
 it can be imported directly with:
 from geodezyx import files_rw
 
@@ -18,21 +22,21 @@ https://github.com/GeodeZYX/geodezyx-toolbox
 """
 
 #### Import the logger
+import functools
+import io
 import logging
+import multiprocessing as mp
 import os
 import pathlib
-import re
-from io import StringIO
 
 import hatanaka
 ########## BEGIN IMPORT ##########
 #### External modules
 import numpy as np
 import pandas as pd
-from tqdm import tqdm
 
 #### geodeZYX modules
-from geodezyx import operational, utils
+from geodezyx import operational
 
 log = logging.getLogger(__name__)
 
@@ -67,20 +71,16 @@ def read_rinex2_obs(rnx_in,
         rnx_wrk = rnx_in
         pass
 
-    LINES = utils.open_readlines_smart(rnx_wrk,verbose=False)
-    EPOCHS = operational.rinex_read_epoch(rnx_wrk,out_index=True)
+    BUF = _rinex_buffer(rnx_wrk)
     if type(rnx_in) is str or type(rnx_in) is pathlib.Path:
         filename = os.path.basename(rnx_in)
     else:
         filename = "unknown filename"
     
     #### Split header and Observation body
-    for il,l in enumerate(LINES):
-        if "END OF HEADER" in l:
-            i_end_header = il
-            break
-        
-    LINES_header = LINES[:i_end_header+1]
+    LINES_header = _header_lines(BUF)
+    Lines_offset = _lines_offset(BUF)
+    EPOCHS = _epochs_read(BUF,Lines_offset,len(LINES_header))
     
     #### get the observables
     Lines_obs = [l for l in LINES_header if '# / TYPES OF OBSERV' in l]
@@ -88,55 +88,74 @@ def read_rinex2_obs(rnx_in,
     Lines_obs = [l[:60] for l in Lines_obs]
     
     ObsAllList_raw = " ".join(Lines_obs).split()
-    ObsAllList = ObsAllList_raw[1:]
-    ObsAllList = [e for sublist in [(e,e+"_LLI",e+"_SSI") for e in ObsAllList] for e in sublist]
-    
     nobs = int(ObsAllList_raw[0])
-    nlines_for_obs = int(np.ceil(nobs/5)) ## 5 is the max num of obs in the RIENX specs
-    columns_width = nobs*[14,1,1]
-    
-    DFall_stk = []
-    
-    #### reading the epochs    
-    for iepoc in tqdm(range(len(EPOCHS)),desc="Reading " + filename):
-        epoch = EPOCHS[iepoc,0]
-        ## define the start/end indices of the epoch block
-        iline_start = EPOCHS[iepoc,1] 
-        if iepoc == len(EPOCHS)-1:
-            iline_end = None
-        else:
-            iline_end = EPOCHS[iepoc+1,1]
+    ## the columns, in the header order 
+    ## (each observable followed by its LLI and SSI)
+    ObsAllList = [e for obs in ObsAllList_raw[1:nobs+1] 
+                  for e in (obs,obs+"_LLI",obs+"_SSI")]
+    nlines_for_obs = -(-nobs // 5) ## 5 is the max num of obs in the RIENX specs
     
-        ### get the lines of the epoch block
-        Lines_epoc = LINES[iline_start:iline_end]
-        
-        ### get the satellites for this epoch block
-        epoc,nsat,lineconcat,Sats_split,iline_sats_end = _sats_find(Lines_epoc)
-        
-        ### for each sat, merge the breaked lines
-        Lines_obs = Lines_epoc[iline_sats_end+1:iline_end]
-        Lines_obs = [e.ljust(80) for e in Lines_obs] # must be exactly 80 char long fut the column trunk !!!!
-        Lines_obs = [e.replace("\r","") for e in Lines_obs] # not 100% sure of this one
-        Lines_obs = [e.replace("\n","") for e in Lines_obs]
-        Lines_obs_merg = [Lines_obs[nlines_for_obs*n:nlines_for_obs*n+nlines_for_obs] for n in range(nsat)]
-        Lines_obs_merg = ["".join(e) for e in Lines_obs_merg]
-        
-        ## read the epoch block using pandas' fixed width reader 
-        B = StringIO("\n".join(Lines_obs_merg))
-        DFepoch = pd.read_fwf(B,header=None,widths=columns_width)  
-        DFepoch.columns = ObsAllList
-        DFepoch["prn"] = Sats_split
-        DFepoch["prn"] = DFepoch["prn"].str.strip()
-        DFepoch["sys"] = DFepoch["prn"].str[0]
-        DFepoch["epoch"] = epoch
-        
-        DFall_stk.append(DFepoch)
+    log.info("Reading %s",filename)
+    
+    #### get the body lines and the epoch blocks
+    iline_body = len(LINES_header)
+    Lines_body = _lines_get(BUF,Lines_offset,iline_body)
+    Iline_epoch = EPOCHS[:,1].astype(int) - iline_body
+    Iline_block_end = np.append(Iline_epoch[1:],len(Lines_body)).astype(int)
+    
+    #### get the satellites of all the epoch blocks in one pass
+    Nsat, Iline_sats_end, Sats = _sats_read(Lines_body,Iline_epoch)
+    Sys = Sats.astype("U1")
+    Prn = np.char.strip(Sats)
+    
+    ## epoch block and rank in its block of each observation record
+    Iepoch = np.repeat(np.arange(len(Nsat)),Nsat)
+    Irank = np.arange(len(Iepoch)) - np.repeat(np.cumsum(Nsat) - Nsat,Nsat)
+    
+    #### for each sat, merge the breaked lines 
+    ## must be exactly 80 char long fut the column trunk !!!!
+    ## a missing line (truncated block) is an empty one (sentinel at the end)
+    Lines_pad = [l.ljust(80) for l in Lines_body] + [""]
+    Iline_rec = Iline_sats_end[Iepoch] + 1 + Irank * nlines_for_obs
+    Lines_obs_parts = []
+    for iline_obs in range(nlines_for_obs):
+        Iline = Iline_rec + iline_obs
+        Iline[Iline >= Iline_block_end[Iepoch]] = len(Lines_body)
+        Lines_obs_parts.append([Lines_pad[i] for i in Iline])
+    Lines_obs_stk = ["".join(e) for e in zip(*Lines_obs_parts)]
         
+    ## read all the epoch blocks at once with the vectorized fixed width reader 
+    Val, Ind = _obs_records_decode(Lines_obs_stk,nobs)
+    
+    ### sort the sats in their epoch block
+    Isort = np.lexsort((Prn,Iepoch))
+    Val, Ind = Val[Isort], Ind[Isort]
+    Prn, Sys, Iepoch = Prn[Isort], Sys[Isort], Iepoch[Isort]
+    ## the epochs are directly datetime64, and broadcasted with the epoch index
+    Epoch_blocks = np.array(EPOCHS[:,0],dtype="datetime64[ns]")
+    Epoch = Epoch_blocks[Iepoch]
     
-    ## final concat and cosmetic (reorder columns, sort)
-    DFrnxobs = pd.concat(DFall_stk)
-    DFrnxobs = DFrnxobs.reindex(["epoch","sys","prn"] + list(sorted(ObsAllList)),axis=1)
-    DFrnxobs.sort_values(["epoch","prn"],inplace=True)
+    ## observations are float, LLI and SSI indicators are nullable Int8
+    DictObs = dict()
+    for iobs,obs in enumerate(ObsAllList_raw[1:nobs+1]):
+        DictObs[obs] = Val[:,iobs]
+        DictObs[obs + "_LLI"] = _indicator_array(Ind[:,iobs,0])
+        DictObs[obs + "_SSI"] = _indicator_array(Ind[:,iobs,1])
+    
+    ## the DataFrame is built at once, with the columns in their final order
+    ## sys and prn are categorical (low cardinality)
+    DictCols = {"epoch":Epoch,
+                "sys":pd.Categorical(Sys,categories=np.unique(Sys)),
+                "prn":pd.Categorical(Prn)}
+    for col in ObsAllList:
+        DictCols[col] = DictObs[col]
+    DFrnxobs = pd.DataFrame(DictCols)
+    
+    ## cosmetic (sort)
+    ## the sats are sorted in each epoch block, thus the rows are already
+    ## sorted by epoch & prn if the epoch blocks are in chronological order
+    if not np.all(np.diff(Epoch_blocks) > np.timedelta64(0)):
+        DFrnxobs.sort_values(["epoch","prn"],inplace=True)
     DFrnxobs.reset_index(drop=True,inplace=True)
     
     
@@ -177,32 +196,31 @@ def read_rinex3_obs(rnx_in,
         rnx_wrk = rnx_in
         pass
     
-    LINES = utils.open_readlines_smart(rnx_wrk)
-    EPOCHS = operational.rinex_read_epoch(rnx_wrk,out_index=True)
+    BUF = _rinex_buffer(rnx_wrk)
     if type(rnx_in) is str or type(rnx_in) is pathlib.Path:
         filename = os.path.basename(rnx_in)
     else:
         filename = "unknown filename"
         
     #### Split header and Observation body
-    for il,l in enumerate(LINES):
-        if "END OF HEADER" in l:
-            i_end_header = il
-            break
-        
-    LINES_header = LINES[:i_end_header+1]
-    #LINES_obs = LINES[i_end_header:]
+    LINES_header = _header_lines(BUF)
+    Lines_offset = _lines_offset(BUF)
+    EPOCHS = _epochs_read(BUF,Lines_offset,len(LINES_header))
     
     #### get the systems and observations
     Lines_sys = [l for l in LINES_header if 'SYS / # / OBS TYPES' in l]
     ## clean SYS / # / OBS TYPES
     Lines_sys = [l[:60] for l in Lines_sys]
     
-    ## manage the 2 lines systems
-    for il,l in enumerate(Lines_sys):
-        if l[0] == " ":
-            Lines_sys[il-1] = Lines_sys[il-1] + l
-            Lines_sys.remove(l)
+    ## manage the multi-lines systems
+    ## (continuation lines start with a blank, and are merged in a single pass)
+    Lines_sys_merg = []
+    for l in Lines_sys:
+        if l[0] == " " and Lines_sys_merg:
+            Lines_sys_merg[-1] = Lines_sys_merg[-1] + l
+        else:
+            Lines_sys_merg.append(l)
+    Lines_sys = Lines_sys_merg
     
     #### store system and observables in a dictionnary
     dict_sys = dict()
@@ -224,47 +242,77 @@ def read_rinex3_obs(rnx_in,
     ##ObsAllList = list(sorted(set([e for sublist in list(dict_sys_use.values())[1:] for e in sublist]))) 
     nobs_max = max(dict_sys_nobs.values())
     
-    DFall_stk = []
     #### reading the epochs
-    for iepoc in tqdm(range(len(EPOCHS)),desc="Reading " + filename):
-        epoch = EPOCHS[iepoc,0]
-        ## define the start/end indices of the epoch block
-        iline_start = EPOCHS[iepoc,1] + 1
-        if iepoc == len(EPOCHS)-1:
-            iline_end = None
-        else:
-            iline_end = EPOCHS[iepoc+1,1]
-        
-        Lines_epoc = LINES[iline_start:iline_end]
-        ###  Remove CR (Carriage Return) and LF (Line Feed) 
-        Lines_epoc = [l.replace('\r', '') for l in Lines_epoc]
-        Lines_epoc = [l.replace('\n', '') for l in Lines_epoc]
-                
-        ## read the epoch block using pandas' fixed width reader 
-        B = StringIO("\n".join(Lines_epoc))
-        
-        columns_width = [3] + nobs_max*[14,1,1]
-        DFepoch = pd.read_fwf(B,header=None,widths=columns_width)      
-               
-        DFepoch_ok_stk = []
-        #### assign the correct observable names for each system
-        for sys in dict_sys_use.keys():
-            #DFepoch_sys = DFepoch[DFepoch[0].str[0] == sys]
-            #                   get the sats of the system sys  ||  get the meaningful columns
-            DFepoch_sys_clean = DFepoch[DFepoch[0].str[0] == sys].iloc[:,:len(dict_sys_use[sys])]
-            DFepoch_sys_clean.columns = dict_sys_use[sys]
-            DFepoch_ok_stk.append(DFepoch_sys_clean)
-                        
-        DFepoch_ok = pd.concat(DFepoch_ok_stk)
-        # An epoch column is created to fasten the process
-        col_epoch = pd.Series([epoch]*len(DFepoch_ok),name="epoch")
-        col_sys = pd.Series(DFepoch_ok['prn'].str[0],name="sys")
-        DFepoch_ok = pd.concat([col_epoch,col_sys,DFepoch_ok],axis=1)
+    log.info("Reading %s",filename)
+    ## the body's lines which are not epoch lines are the observation records
+    iline_body = len(LINES_header)
+    Lines_body = _lines_get(BUF,Lines_offset,iline_body)
+    Iline_epoch = EPOCHS[:,1].astype(int) - iline_body
+    
+    ## index of the epoch of each line
+    Iepoch = np.searchsorted(Iline_epoch,np.arange(len(Lines_body)),side="right") - 1
+    Bool_rec = Iepoch >= 0
+    Bool_rec[Iline_epoch] = False
+    Irec = [i for i in np.flatnonzero(Bool_rec) if Lines_body[i].strip()]
+    Irec = np.array(Irec,dtype=int)
+    
+    Lines_obs_stk = [Lines_body[i] for i in Irec]
+    Iepoch = Iepoch[Irec]
                 
-        DFall_stk.append(DFepoch_ok)
+    ## read all the epoch blocks at once with the vectorized fixed width reader 
+    Val, Ind = _obs_records_decode(Lines_obs_stk,nobs_max,ioff=3)
+    Prn = np.array([l[:3].strip() for l in Lines_obs_stk],dtype="U3")
+    Sys = Prn.astype("U1")
+    ## the epochs are directly datetime64, and broadcasted with the epoch index
+    Epoch = np.array(EPOCHS[:,0],dtype="datetime64[ns]")[Iepoch]
+    
+    ## integer index of the system of each record (in the header's order),
+    ## -1 for the systems not in the header
+    Sys_header = np.array(list(dict_sys_use.keys()),dtype="U1")
+    Isrt_header = np.argsort(Sys_header)
+    Isys = np.searchsorted(Sys_header[Isrt_header],Sys)
+    Isys = Isrt_header[np.clip(Isys,0,len(Sys_header)-1)]
+    Isys[Sys_header[Isys] != Sys] = -1
+    
+    ## keep the sats of the header's systems, 
+    ## sorted system per system in their epochs
+    Irow = np.flatnonzero(Isys >= 0)
+    Irow = Irow[np.lexsort((Isys[Irow],Iepoch[Irow]))]
+    Val, Ind = Val[Irow], Ind[Irow]
+    Prn, Sys, Epoch = Prn[Irow], Sys[Irow], Epoch[Irow]
+    Isys = Isys[Irow]
     
-    ## final concat and cosmetic (reorder columns, sort)
-    DFrnxobs = pd.concat(DFall_stk)
+    #### assign the correct observable names for each system
+    ## the output columns are preallocated, and then filled system per system
+    ## observations are float, LLI and SSI indicators are int8 (-1 if blank)
+    Col_names = [c for cols in dict_sys_use.values() for c in cols[1:]]
+    Col_names = list(dict.fromkeys(Col_names)) ## ordered unique
+    DictCols = dict()
+    for col in Col_names:
+        if col.endswith(("_LLI","_SSI")):
+            DictCols[col] = np.full(len(Irow),-1,dtype=np.int8)
+        else:
+            DictCols[col] = np.full(len(Irow),np.nan)
+    
+    for isys,sys in enumerate(dict_sys_use.keys()):
+        Bool_sys = Isys == isys
+        Val_sys, Ind_sys = Val[Bool_sys], Ind[Bool_sys]
+        for iobs,obs in enumerate(dict_sys[sys]):
+            DictCols[obs][Bool_sys] = Val_sys[:,iobs]
+            DictCols[obs + "_LLI"][Bool_sys] = Ind_sys[:,iobs,0]
+            DictCols[obs + "_SSI"][Bool_sys] = Ind_sys[:,iobs,1]
+            
+    ## LLI and SSI as nullable Int8
+    for col in Col_names:
+        if col.endswith(("_LLI","_SSI")):
+            DictCols[col] = _indicator_array(DictCols[col])
+    
+    ## final DataFrame and cosmetic
+    ## sys and prn are categorical (low cardinality)
+    DFrnxobs = pd.DataFrame({"epoch":Epoch,
+                             "sys":pd.Categorical(Sys,categories=Sys_header),
+                             "prn":pd.Categorical(Prn),
+                             **DictCols})
     #Col_names = list(DFrnxobs.columns)
     #Col_names.remove("epoch")
     #Col_names.remove("prn")
@@ -279,6 +327,54 @@ def read_rinex3_obs(rnx_in,
         
     return DFrnxobs
 
+
+def read_rinex_many(rnx_list,
+                    n_jobs=None,
+                    version=3,
+                    set_index=None):
+    """
+    Read several RINEX Observation files in parallel, 
+    each file being read by a separate process
+
+    Parameters
+    ----------
+    rnx_list : list
+        list of the input RINEXs.
+        see read_rinex2_obs or read_rinex3_obs for the accepted types
+    n_jobs : int, optional
+        number of processes. 
+        If None, the number of CPUs is used.
+        If 1, the files are read sequentially, in the current process.
+        The default is None.
+    version : int, optional
+        version of the RINEXs. 
+        2 uses read_rinex2_obs, 3 or 4 uses read_rinex3_obs.
+        The default is 3.
+    set_index : str or list of str, optional
+        define the columns for the index.
+        see read_rinex2_obs or read_rinex3_obs.
+        The default is None.
+
+    Returns
+    -------
+    DFrnxobs_list : list of Pandas DataFrame / GeodeZYX's RINEX format
+        the read RINEXs, in the same order as rnx_list
+    """
+    if version == 2:
+        fct_read = read_rinex2_obs
+    else:
+        fct_read = read_rinex3_obs
+        
+    fct_read = functools.partial(fct_read,set_index=set_index)
+    
+    if n_jobs == 1:
+        return [fct_read(rnx) for rnx in rnx_list]
+    
+    with mp.Pool(processes=n_jobs) as pool:
+        DFrnxobs_list = pool.map(fct_read,rnx_list,chunksize=1)
+    
+    return DFrnxobs_list
+
 ############ UTILITY FUNCTIONS
 
 
@@ -371,84 +467,293 @@ def dict_sys_obs_clean_LLI_SSI(dict_sys_obs_in):
 
 ############ INTERNAL FUNCTIONS
 
-
-def _sats_find(Lines_inp):
+def _rinex_buffer(rnx_in,decode_type="iso-8859-1"):
     """
-    For RINEX2 only
-    search for the satellites for each epoch block by reading the 
-    EPOCH/SAT record
+    Get the content of a RINEX as a single bytes buffer
 
     Parameters
     ----------
-    Lines_inp : List of str
-        the lines of one epoch block (EPOCH/SAT + OBSERVATION records).
+    rnx_in : see below
+        input RINEX.
+        can be the path of a RINEX file as string or as Path object,
+        or directly the RINEX content as a string, bytes, StringIO object or a 
+        list of lines
+    decode_type : str, optional
+        The encoding standard. The default is "iso-8859-1".
 
     Returns
     -------
-    bloc_tuple : tuple
-        a 5-tuple containing:
-            epoc : datetime, the epoch of block
-            nsat : int, the number of satellites
-            lineconcat : str, the satellites as a concatenated string  
-            Sats_split : list of str, the satellites as a list
-            il : int, the index of the last line of the EPOCH/SAT record
-
-    """
-    iline_bloc = 0
-    nlines_bloc = -1
-    for il,l in enumerate(Lines_inp):
-        ##### 
-        re_epoch = '^ {1,2}([0-9]{1,2} * ){5}'
-        #re_sat="[A-Z][0-9][0-9]"
-        bool_epoch=re.search(re_epoch,l)
-        #bool_sat=re.search(re_sat,l)
+    buf : bytes
+        the RINEX content.
         
-        ### we found an epoch line
-        if bool_epoch:
-            in_epoch = True
-            nsat = int(l[30:32])
-            iline_bloc = 0
-            nlines_bloc = int(np.ceil(nsat / 12))
-            LineBloc = []
-            lineconcat = ""
-            epoc = operational.read_rnx_epoch_line(l,rnx2=True)
-        
-        ### we read the sat lines based on the number of sat
-        if iline_bloc <= nlines_bloc:
-            LineBloc.append(l[32:].strip())
-            lineconcat = lineconcat + l[32:].strip()
-            iline_bloc += 1
-        
-        ### we stack everything when the sat block is over
-        if iline_bloc == nlines_bloc:
-            in_epoch = False
-            Sats_split = [lineconcat[3*n:3*n+3] for n in range(nsat)]
-            bloc_tuple = (epoc,nsat,lineconcat,Sats_split,il)
-            return bloc_tuple
+    Note
+    ----
+    hatanaka.decompress already returns the content as bytes,
+    which is kept as it is. A file is read at once as bytes,
+    the list of lines is generated only for a list input
+    """
+    if type(rnx_in) is bytes:
+        buf = rnx_in
+    elif isinstance(rnx_in,pathlib.Path) or (type(rnx_in) is str and 
+                                             "\n" not in rnx_in):
+        ## path of the file (a RINEX content has several lines)
+        with open(rnx_in,"rb") as F:
+            buf = F.read()
+    elif type(rnx_in) is str:
+        buf = rnx_in.encode(decode_type)
+    elif type(rnx_in) is io.StringIO:
+        buf = rnx_in.getvalue().encode(decode_type)
+    else:
+        buf = "\n".join([l.rstrip("\n") for l in rnx_in]).encode(decode_type)
+    return buf
+
+
+def _header_lines(buf,decode_type="iso-8859-1"):
+    """
+    Get the header lines of a RINEX bytes buffer, 
+    i.e. up to the END OF HEADER line (included)
+    """
+    i_end_header = buf.find(b"END OF HEADER")
+    i_body = buf.find(b"\n",i_end_header) + 1
+    if i_body == 0:
+        i_body = len(buf)
+    return _lines_split(buf[:i_body],decode_type)
+
+
+def _lines_offset(buf):
+    """
+    Get the byte offsets of the beginning of each line 
+    of a RINEX bytes buffer
+    """
+    Ilf = np.flatnonzero(np.frombuffer(buf,dtype=np.uint8) == ord("\n"))
+    return np.append(0,Ilf + 1)
 
 
+def _epochs_read(buf,lines_offset,iline_body=0,decode_type="iso-8859-1"):
+    """
+    Read the epochs of a RINEX bytes buffer, 
+    with operational.rinex_read_epoch_from_lines
+    
+    Only the body's lines starting with a blank or a > 
+    (i.e. the RINEX2 and RINEX3 epoch lines candidates) are decoded, 
+    the RINEX is not read again
 
-def _line_reader(linein,nobs):
+    Returns
+    -------
+    EPOCHS : array
+        2-columns array, with the epochs and the index of their lines
+        (same as operational.rinex_read_epoch with out_index=True)
     """
-    DISCONTINUED
+    Abuf = np.frombuffer(buf,dtype=np.uint8)
+    Ioff = lines_offset[lines_offset < len(buf)]
+    Icand = np.flatnonzero(np.isin(Abuf[Ioff],(ord(" "),ord(">"))))
+    Icand = Icand[Icand >= iline_body]
+    
+    Lines_cand = [_lines_get(buf,lines_offset,i,i+1,decode_type)[0] for i in Icand]
+    EPOCHS = operational.rinex_read_epoch_from_lines(Lines_cand,out_index=True)
     
-    For RINEX3 Only 
+    ## back to the line indices of the whole RINEX
+    if len(EPOCHS) > 0:
+        EPOCHS[:,1] = Icand[EPOCHS[:,1].astype(int)]
+    
+    return EPOCHS
+
+
+def _lines_get(buf,lines_offset,iline_start,iline_end=None,
+               decode_type="iso-8859-1"):
+    """
+    Get the lines between the line indices iline_start and iline_end 
+    of a RINEX bytes buffer, using the line offsets from _lines_offset
+    """
+    ioff_start = lines_offset[iline_start]
+    if iline_end is None or iline_end >= len(lines_offset):
+        ioff_end = None
+    else:
+        ioff_end = lines_offset[iline_end]
+    return _lines_split(buf[ioff_start:ioff_end],decode_type)
+
+
+def _lines_split(buf,decode_type="iso-8859-1"):
+    """
+    Split a RINEX bytes buffer in lines (without CR/LF), 
+    on LF only, consistently with _lines_offset
+    (unlike str's splitlines, for which e.g. \x85 is a boundary in ISO-8859-1)
+    """
+    Lines = buf.split(b"\n")
+    if Lines[-1] == b"": ## the buffer ends with a LF
+        Lines.pop()
+    return [l.rstrip(b"\r").decode(decode_type) for l in Lines]
+
+
+def _obs_records_decode(Lines_obs,nobs,ioff=0):
+    """
+    Decode the observation records of a RINEX at once, in a vectorized way
+    (replaces pandas' fixed width reader, called epoch per epoch before)
     
-    read the content of an observation line. pd.read_fwf does the job
+    Each observable is a F14.3 value, followed by the 
+    Loss of Lock Indicator (LLI) and the Signal Strength Indicator (SSI),
+    as I1 values
+
+    Parameters
+    ----------
+    Lines_obs : list of str
+        the observation records, one line per satellite
+        (i.e. RINEX2's records broken on several lines must be merged).
+    nobs : int
+        the number of observables in a record.
+    ioff : int, optional
+        the number of characters before the 1st observable
+        (3 for the RINEX3's prn). The default is 0.
+
+    Returns
+    -------
+    Val : 2D array of float
+        the decoded observations, with shape (len(Lines_obs), nobs).
+        Blank fields are NaN
+    Ind : 3D array of int8
+        the decoded LLI and SSI indicators, 
+        with shape (len(Lines_obs), nobs, 2).
+        Blank fields are -1
     """
-    columns_width = [3] + nobs*[14,1,1]
-    columns_cumul = [0] + list(np.cumsum(columns_width))
+    nrec = len(Lines_obs)
+    width = ioff + nobs*16
     
-    out_stk = []
-    for i in range(len(columns_cumul)-1):
-        slic = slice(columns_cumul[i],columns_cumul[i+1])
-        out = linein[slic]
-        if i == 0:
-            out_stk.append(out)
-        else:
-            try:
-                out_stk.append(float(out))
-            except:
-                out_stk.append(np.nan)
+    Buf = "".join([l.ljust(width)[:width] for l in Lines_obs])
+    Buf = Buf.encode("ascii",errors="replace")
+    A = np.frombuffer(Buf,dtype=np.uint8).reshape(nrec,width)
+    A = A[:,ioff:].reshape(nrec,nobs,16)
+    
+    ### the F14.3 values
+    Val = _fixed_point_decode(A[:,:,:14],ndec=3)
+    
+    ### the LLI and SSI indicators
+    Ind = A[:,:,14:].astype(np.int8) - ord("0")
+    Ind[(Ind < 0) | (Ind > 9)] = -1
+    
+    return Val, Ind
+    
+
+def _indicator_array(Ind):
+    """
+    Convert LLI or SSI indicators (int8, -1 if blank) to 
+    a pandas' nullable Int8 array (blank as <NA>), without copy
+    """
+    return pd.arrays.IntegerArray(Ind,Ind < 0)
+
+
+def _fixed_point_decode(Afield,ndec=3):
+    """
+    Decode fixed point values (Fw.d Fortran format) stored as bytes,
+    with an integer arithmetic on the digits
+    
+    It avoids the conversion of each field as a string.
+    The fields without the decimal point at its fixed position
+    (or with unexpected characters) are converted as strings.
+
+    Parameters
+    ----------
+    Afield : array of uint8
+        the fields' bytes, with the characters along the last axis,
+        e.g. of shape (nrec,nobs,14) for F14.3 fields.
+    ndec : int, optional
+        number of decimals (d in Fw.d). The default is 3.
+
+    Returns
+    -------
+    Val : array of float
+        the decoded values, with shape Afield.shape[:-1].
+        Blank fields are NaN
+    """
+    width = Afield.shape[-1]
+    idot = width - ndec - 1
+    if (width,ndec) == (14,3):
+        Wdig = _F14_3_WEIGHTS
+    else:
+        Wdig = _fixed_point_weights(width,ndec)
+    
+    Bool_blank = np.all(Afield == ord(" "),axis=-1)
+    Bool_minus = np.any(Afield == ord("-"),axis=-1)
+    Bool_ok = Afield[...,idot] == ord(".")
+    
+    ## the value as an integer (in units of the last decimal)
+    Ival = np.zeros(Afield.shape[:-1],dtype=np.int64)
+    for i in range(width):
+        if i == idot:
+            continue
+        Achar = Afield[...,i]
+        Dig = Achar.astype(np.int64) - ord("0")
+        Bool_dig = (Dig >= 0) & (Dig <= 9)
+        Bool_ok &= Bool_dig | (Achar == ord(" ")) | (Achar == ord("-"))
+        Ival += np.where(Bool_dig,Dig,0) * Wdig[i]
+    
+    ## integer / 10**ndec is correctly rounded, as float(str) is
+    Val = np.where(Bool_minus,-Ival,Ival) / 10.**ndec
+    Val[Bool_blank] = np.nan
+    
+    ## the non-standard fields are converted as strings
+    Bool_str = ~(Bool_ok | Bool_blank)
+    if np.any(Bool_str):
+        Sval = np.array(Afield[Bool_str]).view("S" + str(width))[:,0]
+        Val[Bool_str] = pd.to_numeric(pd.Series(Sval).str.decode("ascii"),
+                                      errors="coerce").values
+    
+    return Val
+
+
+def _fixed_point_weights(width,ndec):
+    """
+    Get the powers of ten of the characters of a Fw.d field
+    (0 for the decimal point), for _fixed_point_decode
+    (read-only array)
+    """
+    idot = width - ndec - 1
+    Wdig = [0 if i == idot else 10**(width - i - 1 - (i < idot)) 
+            for i in range(width)]
+    Wdig = np.array(Wdig,dtype=np.int64)
+    Wdig.flags.writeable = False
+    return Wdig
+
+## the F14.3 layout of the observations is the same for all the epochs 
+## and all the files, its weights are computed once at import
+_F14_3_WEIGHTS = _fixed_point_weights(14,3)
+
+
+def _sats_read(Lines_body,Iline_epoch):
+    """
+    For RINEX2 only
+    read the satellites of all the epoch blocks in one pass,
+    based on the EPOCH/SAT records
+
+    Parameters
+    ----------
+    Lines_body : List of str
+        the lines of the RINEX body.
+    Iline_epoch : array of int
+        the indices of the EPOCH/SAT records in Lines_body.
+
+    Returns
+    -------
+    Nsat : array of int
+        the number of satellites of each epoch block
+    Iline_sats_end : array of int
+        the index of the last line of each EPOCH/SAT record
+    Sats : array of str
+        the satellites of all the epoch blocks, concatenated 
+        (3 chars., not stripped)
+    """
+    Nsat = np.array([int(Lines_body[i][29:32]) for i in Iline_epoch],
+                    dtype=int)
+    ## 12 sats per line, an EPOCH/SAT record has at least one line
+    Nlines_sat = np.maximum(-(-Nsat // 12),1)
+    Iline_sats_end = Iline_epoch + Nlines_sat - 1
+    
+    Sats_stk = []
+    for iline,nsat,nlines in zip(Iline_epoch,Nsat,Nlines_sat):
+        LineBloc = [l[32:].strip() for l in Lines_body[iline:iline+nlines]]
+        Sats_stk.append("".join(LineBloc)[:3*nsat].ljust(3*nsat))
+
+    ## the sats are split with a 3-char. view of the bytes
+    Sats_bytes = "".join(Sats_stk).encode("ascii",errors="replace")
+    Sats = np.frombuffer(Sats_bytes,dtype="S3").astype("U3")
     
-    return out_stk
+    return Nsat, Iline_sats_end, Sats
@@ -93,7 +93,7 @@ def write_rinex3_body(DFrnx_in):
     for epoc, grpepoc in DFepoc:
         ### store the epoch
         lines_stk.append(files_rw.write_epoch_rinex3(epoc, len(grpepoc)))
-        DFsys = grpepoc.groupby('sys')
+        DFsys = grpepoc.groupby('sys',observed=True)
         
         for sys, grpsys in DFsys:        
             grpsys2 = grpsys[["prn"] + dict_sys_obs[sys]].copy()
@@ -167,7 +167,7 @@ def _lli_ssi_nan_to_0(DFrnx_in):
     
     for colname in DFrnx_in:
         if colname.endswith("LLI") or colname.endswith("SSI"):
-            DFrnx_in[colname] = DFrnx_in[colname].replace(np.nan,0)
+            DFrnx_in[colname] = DFrnx_in[colname].fillna(0)
             DFrnx_in[colname] = DFrnx_in[colname].astype(int)
             
     return DFrnx_in
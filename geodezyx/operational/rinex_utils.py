@@ -42,6 +42,8 @@ log = logging.getLogger(__name__)
 
 ##########  END IMPORT  ##########
 
+_RE_EPOCH_RNX2 = re.compile("^ {1,2}([0-9]{1,2} * ){5}")
+
 
 def rinexs_table_from_list(rnxs_inp, site9_col=False, round_date=False, path_col=True):
     """
@@ -424,10 +426,6 @@ def rinex_read_epoch(
         the epochs in the RINEX.
     """
 
-    ##161019 : dirty copier coller de rinex start end
-    epochs_list = []
-    rinex_60sec = False
-
     try:
         input_rinex_path_or_string = hatanaka.decompress(input_rinex_path_or_string)
     except:
@@ -435,10 +433,73 @@ def rinex_read_epoch(
 
     RnxLines = utils.open_readlines_smart(input_rinex_path_or_string)
 
+    OUTPUT = rinex_read_epoch_from_lines(
+        RnxLines,
+        interval_out=interval_out,
+        add_tzinfo=add_tzinfo,
+        out_array=out_array,
+        out_index=out_index,
+    )
+
+    return OUTPUT
+
+
+def rinex_read_epoch_from_lines(
+    RnxLines,
+    interval_out=False,
+    add_tzinfo=False,
+    out_array=True,
+    out_index=False,
+):
+    """
+    Read the epochs contained in the lines of a RINEX. Can handle RINEX 2 and 3
+
+    Same as rinex_read_epoch, but for an already read RINEX,
+    to avoid reading the file again
+
+    Parameters
+    ----------
+    RnxLines : list of str
+        the lines of the RINEX.
+
+    interval_out : bool, optional
+        output also the intervals. The default is False.
+
+    add_tzinfo : bool, optional
+        add timezone information in the datetime's Epoches.
+        The default is False.
+
+    out_array : bool, optional
+        output results as array.
+        The default is True.
+
+    out_index : bool, optional
+        output also the index of the epoch line.
+        The default is False.
+
+    Returns
+    -------
+    array or list
+        the epochs in the RINEX.
+    """
+
+    ##161019 : dirty copier coller de rinex start end
+    epochs_list = []
+    rinex_60sec = False
+
     Index_list = []
     for iline, line in enumerate(RnxLines):
-        epoch_rnx2 = re.search("^ {1,2}([0-9]{1,2} * ){5}", line)
-        epoch_rnx3 = re.search("^>", line)
+        ## cheap pre-filter on the 1st character, before the regex
+        ## (a RINEX2 epoch line starts with a blank, a RINEX3 one with >)
+        char0 = line[:1]
+        if char0 == ">":
+            epoch_rnx2 = False
+            epoch_rnx3 = True
+        elif char0 == " ":
+            epoch_rnx2 = _RE_EPOCH_RNX2.search(line)
+            epoch_rnx3 = False
+        else:
+            continue
 
         if epoch_rnx2:
             try:
@@ -21,6 +21,7 @@ https://github.com/GeodeZYX/geodezyx-toolbox
 ########## BEGIN IMPORT ##########
 #### External modules
 import datetime as dt
+import functools
 import itertools
 #### Import the logger
 import logging
@@ -28,6 +29,7 @@ import os
 import re
 
 import matplotlib
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
 import natsort
 import numpy as np
@@ -136,7 +138,7 @@ def compar_orbit(Data_inp_1,Data_inp_2,step_data = 900,
     if type(Data_inp_1) is str:
         D1orig = files_rw.read_sp3(Data_inp_1,epoch_as_pd_index=True)
     else:
-        D1orig = Data_inp_1.copy(True)
+        D1orig = Data_inp_1.copy(deep=False) # read only, no deep copy needed
         try:
             D1orig.name = Data_inp_1.name
         except:
@@ -153,7 +155,7 @@ def compar_orbit(Data_inp_1,Data_inp_2,step_data = 900,
     if type(Data_inp_2) is str:
         D2orig = files_rw.read_sp3(Data_inp_2,epoch_as_pd_index=True)
     else:
-        D2orig = Data_inp_2.copy(True)
+        D2orig = Data_inp_2.copy(deep=False) # read only, no deep copy needed
         try:
             D2orig.name = Data_inp_2.name
         except:
@@ -177,8 +179,6 @@ def compar_orbit(Data_inp_1,Data_inp_2,step_data = 900,
     if isinstance(D2orig.index[0], (int, np.integer)):
         D2orig.set_index("epoch",inplace=True)
 
-    Diff_sat_stk = []
-
     # This block is for removing null values
     if clean_null_values:
         if clean_null_values == "all":
@@ -190,8 +190,9 @@ def compar_orbit(Data_inp_1,Data_inp_2,step_data = 900,
 
         xyz_lst = ['x','y','z']
 
-        D1_null_bool = all_or_any(np.isclose(D1orig[xyz_lst],0.),axis=1)
-        D2_null_bool = all_or_any(np.isclose(D2orig[xyz_lst],0.),axis=1)
+        # null values in SP3 are exactly 0.000000, a plain equality is enough
+        D1_null_bool = all_or_any(D1orig[xyz_lst].to_numpy() == 0.,axis=1)
+        D2_null_bool = all_or_any(D2orig[xyz_lst].to_numpy() == 0.,axis=1)
 
         D1 = D1orig[np.logical_not(D1_null_bool)]
         D2 = D2orig[np.logical_not(D2_null_bool)]
@@ -207,26 +208,55 @@ def compar_orbit(Data_inp_1,Data_inp_2,step_data = 900,
             sat_nul = []
 
     else:
-        D1 = D1orig.copy()
-        D2 = D2orig.copy()
-
-    D1sys_grp = D1.groupby("sys")
-    D2sys_grp = D2.groupby("sys")
-
+        D1 = D1orig
+        D2 = D2orig
+
+    # checking if the data correspond to the step
+    # (integer nanoseconds, thus also valid beyond the 1st day)
+    step_ns = int(step_data * 10**9)
+    T1_ns = D1.index.values.astype("datetime64[ns]").astype(np.int64)
+    T2_ns = D2.index.values.astype("datetime64[ns]").astype(np.int64)
+    bool_step1 = np.mod(T1_ns - np.min(T1_ns),step_ns) == 0
+    bool_step2 = np.mod(T2_ns - np.min(T2_ns),step_ns) == 0
+
+    # only the needed columns are kept in the working DataFrames
+    col_wrk = ['sys','prni','x','y','z']
+    D1win_all = D1.loc[bool_step1,col_wrk]
+    D2win_all = D2.loc[bool_step2,col_wrk]
+
+    # the data are grouped once, per system
+    # only the row positions of the groups are stored, 
+    # the system's data are extracted one at a time when needed
+    D1sys_ind = D1win_all.groupby("sys").indices
+    D2sys_ind = D2win_all.groupby("sys").indices
+    Prni1_all = D1win_all['prni'].to_numpy()
+    Prni2_all = D2win_all['prni'].to_numpy()
+
+    # the UTC epochs for the ECEF => ECI conversion are computed once,
+    # for all the epochs of the comparison, and then looked up per system
+    if convert_ECEF_ECI:
+        Epoc_gps_all = D1win_all.index.unique()
+        Epoc_utc_all = conv.dt_gpstime2dt_utc(Epoc_gps_all.to_pydatetime(),
+                                              out_array=True)
+        Epoc_utc_all = pd.Series(Epoc_utc_all.astype("datetime64[ns]"),
+                                 index=Epoc_gps_all)
+
+    #### first pass: find the common sats and epochs of each system
+    sys_blocks = []
     for sysuse in sys_used_list:
-        D1sys = D1sys_grp.get_group(sysuse) # D1sys = D1[D1['sys'] == sysuse]
-        D2sys = D2sys_grp.get_group(sysuse) # D2sys = D2[D2['sys'] == sysuse]
-
-        # checking if the data correspond to the step
-        bool_step1 = np.mod((D1sys.index - np.min(D1.index)).seconds,step_data) == 0
-        bool_step2 = np.mod((D2sys.index - np.min(D2.index)).seconds,step_data) == 0
-
-        D1win = D1sys[bool_step1]
-        D2win = D2sys[bool_step2]
+        # NB: a system can be absent of a file after the step filter,
+        # its row positions are then empty
+        Ind1 = D1sys_ind.get(sysuse,[])
+        Ind2 = D2sys_ind.get(sysuse,[])
+        Epoc1 = D1win_all.index[Ind1] # D1win_all[D1win_all['sys'] == sysuse].index
+        Epoc2 = D2win_all.index[Ind2] # D2win_all[D2win_all['sys'] == sysuse].index
         
         # find common sats and common epochs
-        prni_set = sorted(list(set(D1win['prni']).intersection(set(D2win['prni']))))
-        epoc_set = sorted(list(set(D1win.index).intersection(set(D2win.index))))
+        prni_set1 = set(np.unique(Prni1_all[Ind1]).tolist())
+        prni_set2 = set(np.unique(Prni2_all[Ind2]).tolist())
+        prni_set = sorted(list(prni_set1.intersection(prni_set2)))
+        epoc_set = Epoc1.unique().intersection(Epoc2.unique())
+        epoc_set = epoc_set.sort_values()
 
         # if special selection of sats, then apply it
         # (it is late and this selection is incredibely complicated ...)
@@ -236,131 +266,118 @@ def compar_orbit(Data_inp_1,Data_inp_2,step_data = 900,
             # and apply it
             prni_set = sorted(list(set(prni_set).intersection(set(prni_used_select_list))))
 
-        D1win_prni_grp = D1win.groupby("prni")
-        D2win_prni_grp = D2win.groupby("prni")
-
-        for prni in prni_set:
-            # First research : find corresponding epoch for the SV
-            # this one is sufficent if there is no gaps (e.g. with 0.00000) i.e.
-            # same nb of obs in the 2 files
-            # NB : .reindex() is smart, it fills the DataFrame
-            # with NaN
-            try:
-                D1prni_orig = D1win_prni_grp.get_group(prni).reindex(epoc_set)
-                # D1win[D1win['prni'] == prni].reindex(epoc_set)
-                D2prni_orig = D2win_prni_grp.get_group(prni).reindex(epoc_set)
-                # D2win[D2win['prni'] == prni].reindex(epoc_set)
-            except Exception as exce:
-                log.info("ERR : Unable to re-index with an unique epoch")
-                log.info("      are you sure there is no multiple-defined epochs for the same sat ?")
-                log.info("      it happens e.g. when multiple ACs are in the same DataFrame ")
-                log.info("TIP : Filter the input Dataframe before calling this fct with")
-                log.info("      DF = DF[DF['AC'] == 'gbm']")
-                
-                Dtmp1 = D1orig[D1orig['prni'] == prni]
-                Dtmp2 = D2orig[D2orig['prni'] == prni]
-                
-                dupli1 = np.sum(Dtmp1.duplicated(["epoch","prn"]))
-                dupli2 = np.sum(Dtmp2.duplicated(["epoch","prn"]))
-                
-                log.info("FWIW: duplicated epoch/sat in DF1 & DF2: %s %s",dupli1,dupli2)
-
-                raise exce
-
-            # Second research, it is a security in case of gap
-            # This step is useless, because .reindex() will fill the DataFrame
-            # with NaN
-            if len(D1prni_orig) != len(D2prni_orig):
-                log.info("different epochs nbr for SV %s %s %s",prni, len(D1prni_orig), len(D2prni_orig))
-                epoc_prni_set = sorted(list(set(D1prni_orig.index).intersection(set(D2prni_orig.index))))
-                D1prni = D1prni_orig.loc[epoc_prni_set]
-                D2prni = D2prni_orig.loc[epoc_prni_set]
-            else:
-                D1prni = D1prni_orig
-                D2prni = D2prni_orig
-
-            P1 = D1prni[['x','y','z']]
-            P2 = D2prni[['x','y','z']]
-
-            # Start ECEF => ECI
-            if convert_ECEF_ECI:
-                # Backup because the columns xyz will be reaffected
-                #D1sv_bkp = D1prni.copy()
-                #D2sv_bkp = D2prni.copy()
-    
-                P1b = conv.ECEF2ECI(np.array(P1),conv.dt_gpstime2dt_utc(P1.index.to_pydatetime(),out_array=True))
-                P2b = conv.ECEF2ECI(np.array(P2),conv.dt_gpstime2dt_utc(P2.index.to_pydatetime(),out_array=True))
-
-                D1prni[['x','y','z']] = P1b
-                D2prni[['x','y','z']] = P2b
-
-                P1 = D1prni[['x','y','z']]
-                P2 = D2prni[['x','y','z']]
-            # End ECEF => ECI
-
-            if not RTNoutput:
-                # Compatible with the documentation +
-                # empirically tested with OV software
-                # it is  P1 - P2 (and not P2 - P1)
-                Delta_P = P1 - P2
-
-                Diff_sat = Delta_P.copy()
-                Diff_sat.columns = ['dx','dy','dz']
-
-            else:
-                rnorm = np.linalg.norm(P1,axis=1)
-
-                Vx = utils.diff_pandas(D1prni,'x',use_np_diff=True)
-                Vy = utils.diff_pandas(D1prni,'y',use_np_diff=True)
-                Vz = utils.diff_pandas(D1prni,'z',use_np_diff=True)
-                
-                V = pd.concat((Vx , Vy , Vz),axis=1)
-                V.columns = ['vx','vy','vz']
-
-                R = P1.divide(rnorm,axis=0)
-                R.columns = ['xnorm','ynorm','znorm']
-
-                H = pd.DataFrame(np.cross(R,V),columns=['hx','hy','hz'])
-                hnorm = np.linalg.norm(H,axis=1)
-
-                C = H.divide(hnorm,axis=0)
-                C.columns = ['hxnorm','hynorm','hznorm']
-
-                I = pd.DataFrame(np.cross(C,R),columns=['ix','iy','iz'])
-
-                R_ar = np.array(R)
-                I_ar = np.array(I)
-                C_ar = np.array(C)
+        # the system is skipped if it is absent of a file after the step
+        # filter, or if it has no common sats or no common epochs
+        if len(prni_set) == 0 or len(epoc_set) == 0:
+            continue
 
-                #R_ar[1]
-                Beta = np.stack((R_ar,I_ar,C_ar),axis=1)
+        sys_blocks.append((sysuse,prni_set,epoc_set))
+
+    #### the output arrays are preallocated for all the sats at once
+    ## each sat is reindexed on the common epochs of its system
+    nrow_tot = int(np.sum([len(b[1]) * len(b[2]) for b in sys_blocks]))
+    Diff_ar = np.empty((nrow_tot,3))
+    Epoc_ar = np.empty(nrow_tot,dtype=D1.index.dtype)
+    Iblock_ar = np.empty(nrow_tot,dtype=np.int64) # index of the (sys,prni) block
+    sys_block_lis = []
+    prni_block_lis = []
+    irow = 0
+    
+    #### second pass: compute the differences, per system,
+    ## for all the sats at once
+    for sysuse,prni_set,epoc_set in sys_blocks:
+        nsat , nepoc = len(prni_set) , len(epoc_set)
+        if nsat == 0:
+            continue
 
-                # Compatible with the documentation +
-                # empirically tested with OV software
-                # it is  P1 - P2 (and not P2 - P1)
-                Delta_P = P1 - P2
+        # the sats of the system are reindexed in one go, on the full
+        # (prni,epoch) product, i.e. the common epochs for all the sats
+        # NB : .reindex() is smart, it fills the DataFrame
+        # with NaN in case of gap (e.g. with 0.00000)
+        full_idx = pd.MultiIndex.from_product([prni_set,epoc_set],
+                                              names=['prni',epoc_set.name])
+        # only the coordinates are reindexed, and directly 
+        # converted to (Nsat*Nepoc,3) arrays, sat after sat
+        try:
+            P1_ar = _orbit_sys_reindex(D1win_all.iloc[D1sys_ind[sysuse]],full_idx)
+            P2_ar = _orbit_sys_reindex(D2win_all.iloc[D2sys_ind[sysuse]],full_idx)
+        except Exception as exce:
+            log.info("ERR : Unable to re-index with an unique epoch")
+            log.info("      are you sure there is no multiple-defined epochs for the same sat ?")
+            log.info("      it happens e.g. when multiple ACs are in the same DataFrame ")
+            log.info("TIP : Filter the input Dataframe before calling this fct with")
+            log.info("      DF = DF[DF['AC'] == 'gbm']")
+            
+            Dtmp1 = D1orig[D1orig['sys'] == sysuse]
+            Dtmp2 = D2orig[D2orig['sys'] == sysuse]
+            
+            dupli1 = np.sum(Dtmp1.duplicated(["epoch","prn"]))
+            dupli2 = np.sum(Dtmp2.duplicated(["epoch","prn"]))
+            
+            log.info("FWIW: duplicated epoch/sat in DF1 & DF2: %s %s",dupli1,dupli2)
 
-                # Final determination
-                Astk = []
+            raise exce
 
-                for i in range(len(Delta_P)):
-                    A = np.dot(Beta[i,:,:],np.array(Delta_P)[i])
-                    Astk.append(A)
+        # Start ECEF => ECI
+        # (on the arrays, the DataFrames are not modified)
+        # the sats are reindexed on the common epochs, thus the UTC epochs
+        # for the ECEF => ECI conversion are the same for all the sats
+        if convert_ECEF_ECI:
+            Epoc_utc = np.tile(Epoc_utc_all.loc[epoc_set].to_numpy(),nsat)
+            P1_ar = conv.ECEF2ECI(P1_ar,Epoc_utc)
+            P2_ar = conv.ECEF2ECI(P2_ar,Epoc_utc)
+        # End ECEF => ECI
 
-                Diff_sat = pd.DataFrame(np.vstack(Astk),
-                                        index = P1.index,
-                                        columns=['dr','dt','dn'])
+        if not RTNoutput:
+            # Compatible with the documentation +
+            # empirically tested with OV software
+            # it is  P1 - P2 (and not P2 - P1)
+            Astk = P1_ar - P2_ar
 
-            Diff_sat = Diff_sat * conv_coef # metrer conversion
+        else:
+            P1_ar = P1_ar.reshape(nsat,nepoc,3)
+            P2_ar = P2_ar.reshape(nsat,nepoc,3)
+            
+            # velocity by differentiation of the positions,
+            # along the epoch axis, NaN for the 1st epoch
+            Dt = np.diff(epoc_set.values) / np.timedelta64(1,'s')
+            V_ar = np.full_like(P1_ar,np.nan)
+            V_ar[:,1:] = np.diff(P1_ar,axis=1) / Dt[np.newaxis,:,np.newaxis]
+
+            # Compatible with the documentation +
+            # empirically tested with OV software
+            # it is  P1 - P2 (and not P2 - P1)
+            Astk = _rtn_rotate(P1_ar,P2_ar,V_ar).reshape(nsat*nepoc,3)
+
+        # the system block is written in the preallocated arrays
+        nrow = nsat * nepoc
+        iblk = len(sys_block_lis)
+        # metrer conversion, written directly in the preallocated array
+        np.multiply(Astk,conv_coef,out=Diff_ar[irow:irow+nrow])
+        Epoc_ar[irow:irow+nrow] = np.tile(epoc_set.values,nsat)
+        Iblock_ar[irow:irow+nrow] = np.repeat(np.arange(iblk,iblk+nsat),nepoc)
+        sys_block_lis.extend([sysuse] * nsat)
+        prni_block_lis.extend(prni_set)
+        Date = epoc_set[0]
+        irow += nrow
 
-            Diff_sat['sys'] = [sysuse] * len(Diff_sat.index)
-            Diff_sat['prni'] = [prni] * len(Diff_sat.index)
-            Diff_sat['prn'] = [sysuse + str(prni).zfill(2)] * len(Diff_sat.index)
+    if RTNoutput:
+        Diff_col_names = ['dr','dt','dn']
+    else:
+        Diff_col_names = ['dx','dy','dz']
 
-            Diff_sat_stk.append(Diff_sat)
+    Diff_sat_all = pd.DataFrame(Diff_ar,
+                                index=pd.Index(Epoc_ar,name=D1.index.name),
+                                columns=Diff_col_names)
 
-    Diff_sat_all = pd.concat(Diff_sat_stk)
-    Date = Diff_sat.index[0]
+    # sys and prn are categorical (low cardinality)
+    Sys_block = np.array(sys_block_lis,dtype=str)
+    Prni_block = np.array(prni_block_lis,dtype=np.int64)
+    Prn_block = [s + str(p).zfill(2) for s,p in zip(sys_block_lis,prni_block_lis)]
+    Prn_block = np.array(Prn_block,dtype=str)
+    Diff_sat_all['sys'] = pd.Categorical(Sys_block[Iblock_ar])
+    Diff_sat_all['prni'] = Prni_block[Iblock_ar]
+    Diff_sat_all['prn'] = pd.Categorical(Prn_block[Iblock_ar])
 
     # Attribute definition
     if RTNoutput:
@@ -412,6 +429,69 @@ def compar_orbit(Data_inp_1,Data_inp_2,step_data = 900,
         return Diff_sat_all
 
 
+def _orbit_sys_reindex(Dsys,full_idx):
+    """
+    internal function for compar_orbit
+    
+    reindex the coordinates of the sats of a system 
+    on a (prni,epoch) MultiIndex
+    
+    Parameters
+    ----------
+    Dsys : DataFrame
+        the orbit DataFrame of one system, with the epoch as index
+        and a 'prni' column
+    full_idx : MultiIndex
+        the (prni,epoch) MultiIndex
+
+    Returns
+    -------
+    P_ar : numpy.array of floats
+        the positions, shape (len(full_idx),3), NaN in case of gap
+    """
+    Dxyz = Dsys[['prni','x','y','z']].set_index('prni',append=True)
+    Dxyz = Dxyz.swaplevel().reindex(full_idx)
+    return Dxyz.to_numpy(dtype=np.float64)
+
+
+def _rtn_rotate(P1,P2,V):
+    """
+    internal function for compar_orbit
+    
+    express the differences P1 - P2 in the Radial Transverse Normal 
+    frame of P1, for all the epochs at once
+    
+    Parameters
+    ----------
+    P1 & P2 : array-like of floats
+        the positions, shape (N,3) or (Nsat,N,3)
+    V : array-like of floats
+        the velocity (or the position differentiate) of P1, 
+        same shape as P1
+
+    Returns
+    -------
+    Astk : numpy.array of floats
+        the RTN differences, same shape as P1
+    """
+    P1 = np.ascontiguousarray(P1,dtype=np.float64)
+    P2 = np.ascontiguousarray(P2,dtype=np.float64)
+    V  = np.ascontiguousarray(V,dtype=np.float64)
+    
+    R = P1 / np.linalg.norm(P1,axis=-1,keepdims=True)
+    H = np.cross(R,V)
+    C = H / np.linalg.norm(H,axis=-1,keepdims=True)
+    I = np.cross(C,R)
+
+    Beta = np.stack((R,I,C),axis=-2)
+    
+    # Final determination
+    # all the epochs (and sats) are rotated at once (batched matrix product)
+    Astk = np.einsum('...ij,...j->...i',Beta,P1 - P2)
+    
+    return Astk
+
+
 def compar_orbit_plot(Diff_sat_all_df_in,
                       save_plot=False,
                       save_plot_dir="",
@@ -464,23 +544,31 @@ def compar_orbit_plot(Diff_sat_all_df_in,
         col_name1 = Diff_sat_all_df_in.columns[1]
         col_name2 = Diff_sat_all_df_in.columns[2]
 
-    for satuse,color in zip(satdispo,Colors):
-        Diffuse = Diff_sat_all_df_in[Diff_sat_all_df_in['prn'] == satuse]
+    # one LineCollection per axis (i.e. one artist for all the sats)
+    # instead of one Line2D per sat and per axis
+    Time_num = mdates.date2num(Diff_sat_all_df_in.index)
+    Diff_arr = Diff_sat_all_df_in[[col_name0,col_name1,col_name2]].to_numpy(dtype=np.float64)
+    Diff_prn_ind = Diff_sat_all_df_in.groupby('prn',observed=True).indices
 
-        Time = Diffuse.index
-        R    = Diffuse[col_name0]
-        T    = Diffuse[col_name1]
-        N    = Diffuse[col_name2]
+    Segs_stk = [[],[],[]]
+    for satuse,color in zip(satdispo,Colors):
+        isat = Diff_prn_ind[satuse]
+        for icol in range(3):
+            Segs_stk[icol].append(np.column_stack((Time_num[isat],
+                                                   Diff_arr[isat,icol])))
 
-        #fig.fmt_xdata = mdates.DateFormatter('%Y-%m-%d')
+        # proxy artist for the legend
+        Symb = matplotlib.lines.Line2D([],[],label=satuse,c=color)
+        SymbStk.append(Symb)
 
-        Symb = axr.plot(Time,R,label=satuse,c=color)
-        axt.plot(Time,T,label=satuse,c=color)
-        axn.plot(Time,N,label=satuse,c=color)
+    for ax,Segs in zip((axr,axt,axn),Segs_stk):
+        ax.add_collection(matplotlib.collections.LineCollection(Segs,
+                                                                colors=Colors))
+        ax.xaxis_date()
+        ax.autoscale_view()
 
-        SymbStk.append(Symb[0])
-
-        fig.autofmt_xdate()
+    #fig.fmt_xdata = mdates.DateFormatter('%Y-%m-%d')
+    fig.autofmt_xdate()
 
 
     ylabuni = " (" + yaxis_label_unit + ")"
@@ -513,7 +601,6 @@ def compar_orbit_plot(Diff_sat_all_df_in,
         pass
         
         
-    import matplotlib.dates as mdates
     fig.fmt_xdata = mdates.DateFormatter('%Y-%m-%d')
 
     lgd = fig.legend(tuple(SymbStk), satdispo , loc='lower center',ncol=8,
@@ -592,45 +679,35 @@ def compar_orbit_table(Diff_sat_all_df_in,RMS_style = 'natural',
         col_name1 = Diff_sat_all_df_in.columns[1]
         col_name2 = Diff_sat_all_df_in.columns[2]
 
-    rms_stk = []
-
-    for sat in sat_list:
-        Diffwork = utils.df_sel_val_in_col(Diff_sat_all_df_in,'prn',sat)
-
-        if RMS_style == "natural":
-            rms_A = stats.rms_mean(Diffwork[col_name0])
-            rms_B = stats.rms_mean(Diffwork[col_name1])
-            rms_C = stats.rms_mean(Diffwork[col_name2])
-        elif RMS_style == "GRGS":
-            rms_A = stats.rms_mean(Diffwork[col_name0] - Diffwork[col_name0].mean())
-            rms_B = stats.rms_mean(Diffwork[col_name1] - Diffwork[col_name1].mean())
-            rms_C = stats.rms_mean(Diffwork[col_name2] - Diffwork[col_name2].mean())
-        elif RMS_style == "kouba":
-            rms_A = stats.rms_mean_kouba(Diffwork[col_name0])
-            rms_B = stats.rms_mean_kouba(Diffwork[col_name1])
-            rms_C = stats.rms_mean_kouba(Diffwork[col_name2])
-            
-        RMS3D = np.sqrt(rms_A**2 + rms_B**2 + rms_C**2)
-
-        min_A = Diffwork[col_name0].min()
-        min_B = Diffwork[col_name1].min()
-        min_C = Diffwork[col_name2].min()
+    col_names = [col_name0,col_name1,col_name2]
+    
+    # the statistics of all the sats are computed at once, 
+    # with one grouped sweep per indicator
+    Diff_prn_grp = Diff_sat_all_df_in.groupby('prn',observed=True)[col_names]
+    Prn = Diff_sat_all_df_in['prn']
 
-        max_A = Diffwork[col_name0].max()
-        max_B = Diffwork[col_name1].max()
-        max_C = Diffwork[col_name2].max()
+    if RMS_style == "natural":
+        Diff_sq = Diff_sat_all_df_in[col_names]**2
+        Rms_sat = np.sqrt(Diff_sq.groupby(Prn,observed=True).mean())
+    elif RMS_style == "GRGS":
+        Diff_sq = (Diff_sat_all_df_in[col_names] - Diff_prn_grp.transform('mean'))**2
+        Rms_sat = np.sqrt(Diff_sq.groupby(Prn,observed=True).mean())
+    elif RMS_style == "kouba":
+        Rms_sat = Diff_prn_grp.agg(stats.rms_mean_kouba)
+        
+    Rms_sat = Rms_sat.reindex(sat_list)
+    Rms_sat["rms3D"] = np.sqrt(Rms_sat[col_name0]**2 + 
+                               Rms_sat[col_name1]**2 + 
+                               Rms_sat[col_name2]**2)
 
-        mean_A = Diffwork[col_name0].mean()
-        mean_B = Diffwork[col_name1].mean()
-        mean_C = Diffwork[col_name2].mean()
+    if light_tab:
+        Tab_sat = Rms_sat.values
+    else:
+        ## min, max, mean for A, then for B, then for C
+        Min_max_mean_sat = Diff_prn_grp.agg(["min","max","mean"]).reindex(sat_list)
+        Tab_sat = np.column_stack((Rms_sat.values,Min_max_mean_sat.values))
 
-        if light_tab:
-            rms_stk.append([rms_A,rms_B,rms_C,RMS3D])
-        else:
-            rms_stk.append([rms_A,rms_B,rms_C,RMS3D,
-                            min_A,max_A,mean_A,
-                            min_B,max_B,mean_B,
-                            min_C,max_C,mean_C])
+    rms_stk = Tab_sat.tolist()
 
 
     #################################
@@ -892,7 +969,6 @@ def compar_clk_plot(Diff_sat_all_df_in,
         pass
         
         
-    import matplotlib.dates as mdates
     fig.fmt_xdata = mdates.DateFormatter('%Y-%m-%d')
        
     lgd = fig.legend(tuple(SymbStk), satdispo , loc='lower center',ncol=8,
@@ -971,45 +1047,37 @@ def compar_sinex(snx1 , snx2 , stat_select = None, invert_select=False,
     D2Common = D2[D2["STAT"].isin(STATCommon)].sort_values("STAT").reset_index(drop=True)
 
 
-    Ddiff = pd.DataFrame()
-    Ddiff = Ddiff.assign(STAT=D1Common["STAT"])
+    X1 = D1Common[["x","y","z"]].to_numpy(dtype=np.float64)
+    X2 = D2Common[["x","y","z"]].to_numpy(dtype=np.float64)
 
     #### XYZ Part
-    for xyz in ("x","y","z"):
-
-        dif = pd.to_numeric((D2Common[xyz] - D1Common[xyz]))
-
-        Ddiff = Ddiff.assign(xyz=dif)
-        Ddiff = Ddiff.rename(columns={"xyz": xyz})
-
-    D3D = np.sqrt((Ddiff["x"]**2 + Ddiff["y"]**2 + Ddiff["z"]**2 ).astype('float64'))
-
-    Ddiff = Ddiff.assign(d3D_xyz=D3D)
+    dX = X2 - X1
+    D3Dxyz = np.sqrt(np.sum(dX**2,axis=1))
 
     ### ENU Part
-    E , N ,U = [] , [] , []
-    enu_stk = []
-
-    for (_,l1) , (_,l2) in zip( D1Common.iterrows() , D2Common.iterrows() ):
-        enu   = conv.XYZ2ENU_2(l1["x"],l1["y"],l1["z"],l2["x"],l2["y"],l2["z"])
-        enu_stk.append(np.array(enu))
-
-
-    if len(enu_stk) == 0:
+    # all the stations are converted at once, 
+    # each one w.r.t. its own position in D2
+    if len(X1) == 0:
         E,N,U = np.array([]) , np.array([]) , np.array([])
     else:
-        ENU = np.hstack(enu_stk)
-        E,N,U = ENU[0,:] , ENU[1,:] , ENU[2,:]
-
-
-    D2D = np.sqrt((E**2 + N**2).astype('float64'))
-    D3D = np.sqrt((E**2 + N**2 + U**2 ).astype('float64'))
-
-    Ddiff = Ddiff.assign(e=E)
-    Ddiff = Ddiff.assign(n=N)
-    Ddiff = Ddiff.assign(u=U)
-    Ddiff = Ddiff.assign(d2D_enu=D2D)
-    Ddiff = Ddiff.assign(d3D_enu=D3D)
+        E,N,U = conv.XYZ2ENU_2(X1[:,0],X1[:,1],X1[:,2],
+                               X2[:,0],X2[:,1],X2[:,2])
+        E,N,U = np.atleast_1d(E) , np.atleast_1d(N) , np.atleast_1d(U)
+
+    D2Denu = np.sqrt(E**2 + N**2)
+    D3Denu = np.sqrt(E**2 + N**2 + U**2)
+
+    ### the diff DataFrame is built in one go
+    Ddiff = pd.DataFrame({"STAT"    : D1Common["STAT"],
+                          "x"       : dX[:,0],
+                          "y"       : dX[:,1],
+                          "z"       : dX[:,2],
+                          "d3D_xyz" : D3Dxyz,
+                          "e"       : E,
+                          "n"       : N,
+                          "u"       : U,
+                          "d2D_enu" : D2Denu,
+                          "d3D_enu" : D3Denu})
 
     #    E,N,U    = conv.XYZ2ENU_2((X,Y,Z,x0,y0,z0))
     #    E,N,U    = conv.XYZ2ENU_2((X,Y,Z,x0,y0,z0))
@@ -1468,8 +1536,8 @@ def OrbDF_multidx_2_reg(OrbDFin,index_order=["prn","epoch"]):
     """
     OrbDFwrk = OrbDFin.reset_index()
     OrbDFwrk = OrbDFwrk.sort_values(index_order)
-    OrbDFwrk["sys"] = OrbDFwrk["prn"].apply(lambda x: x[0])
-    OrbDFwrk["prni"] = OrbDFwrk["prn"].apply(lambda x: int(x[1:]))
+    OrbDFwrk["sys"] = OrbDFwrk["prn"].str[0]
+    OrbDFwrk["prni"] = OrbDFwrk["prn"].str[1:].astype(int)
     return OrbDFwrk
 
 def OrbDF_common_epoch_finder(OrbDFa_in,OrbDFb_in,return_index=False,
@@ -1547,18 +1615,53 @@ def OrbDF_common_epoch_finder(OrbDFa_in,OrbDFb_in,return_index=False,
         return OrbDFa_out , OrbDFb_out
 
 
+@functools.lru_cache(maxsize=512)
+def _prn_split(prn):
+    """
+    internal function for OrbDF_const_sv_columns_maker
+    
+    split a prn (e.g. 'G07') in its system ('G') and its number (7)
+    the result is cached, since the same sats come back in every SP3
+    """
+    return prn[0] , int(prn[1:])
+
+
 def OrbDF_const_sv_columns_maker(OrbDFin,inplace=True):
     """
     (re)generate the const and sv columns from the sat one
     """
     if inplace:
-        OrbDFin['sys'] = OrbDFin['prn'].str[0]
-        OrbDFin['prni']    = OrbDFin['prn'].apply(lambda x: int(x[1:]))
+        OrbDFout = OrbDFin
+    else:
+        # the sys & prni columns are (re)assigned, not modified in place
+        # thus no deep copy is needed
+        OrbDFout = OrbDFin.copy(deep=False)
+
+    Prn = OrbDFout['prn']
+
+    # the split is done on the unique sats only (cached between calls),
+    # and then mapped back to all the rows with the codes
+    if isinstance(Prn.dtype,pd.CategoricalDtype):
+        Codes , Prn_uniq = Prn.cat.codes.to_numpy() , Prn.cat.categories
+    else:
+        Codes , Prn_uniq = pd.factorize(Prn)
+
+    Split_uniq = [_prn_split(prn) for prn in Prn_uniq]
+    Sys_uniq  = pd.array([e[0] for e in Split_uniq],dtype=Prn_uniq.dtype)
+    Prni_uniq = pd.array([e[1] for e in Split_uniq],dtype="Int64")
+    # (a NaN prn gives a NaN and then an error at the int conversion)
+    Sys  = Sys_uniq.take(Codes,allow_fill=True)
+    Prni = Prni_uniq.take(Codes,allow_fill=True).astype(int)
+
+    if isinstance(Prn.dtype,pd.CategoricalDtype):
+        Sys = pd.Categorical(Sys)
+
+    OrbDFout['sys']  = Sys
+    OrbDFout['prni'] = Prni
+
+    if inplace:
         return None
     else:
-        OrbDFout = OrbDFin.copy()
-        OrbDFout['sys'] = OrbDFout['prn'].str[0]
-        OrbDFout['prni']    = OrbDFout['prn'].apply(lambda x: int(x[1:]))
         return OrbDFout
 
  #   _____ _            _      _____        _        ______                              
@@ -1900,6 +2003,39 @@ def get_block_svn(sat_in,svn_prn_equiv_DF):
     return block    
 
 
+def _grouped_stats_bincount(Codes,Val,ngrp):
+    """
+    internal function for stats_slr
+    
+    compute the mean, std (sample one, ddof=1) and RMS
+    of values per group, based on np.bincount
+    
+    Parameters
+    ----------
+    Codes : array of int
+        the group code of each value (between 0 and ngrp-1)
+    Val : array of floats
+        the values
+    ngrp : int
+        the number of groups
+
+    Returns
+    -------
+    Mean, Std, Rms : arrays of floats
+        the stats for each group, shape (ngrp,)
+    """
+    Nval = np.bincount(Codes,minlength=ngrp)
+    Mean = np.bincount(Codes,weights=Val,minlength=ngrp) / Nval
+    Rms  = np.sqrt(np.bincount(Codes,weights=Val**2,minlength=ngrp) / Nval)
+    # std with the deviations w.r.t. the group mean (two-pass, stable)
+    Dev  = Val - Mean[Codes]
+    # sample std (ddof=1), NaN for a single value group, like pandas' std
+    with np.errstate(divide='ignore',invalid='ignore'):
+        Std = np.sqrt(np.bincount(Codes,weights=Dev**2,minlength=ngrp) / (Nval - 1))
+    Std[Nval <= 1] = np.nan
+    return Mean, Std, Rms
+
+
 def stats_slr(DFin,grpby_keys = ['sat'],
               threshold = .5):
     """
@@ -1921,16 +2057,37 @@ def stats_slr(DFin,grpby_keys = ['sat'],
     -------
     DD : Output statistics DataFrame
         return the mean, the rms and the std.
+        the groups are in their order of appearance in DFin (not sorted)
     """
     
-    DD = DFin[np.abs(DFin["res"]) < threshold]
-    
-    DD_grp  = DD.groupby(grpby_keys)
-    DD_mean = DD_grp['res'].agg(np.mean).rename('mean') * 1000
-    DD_rms  = DD_grp['res'].agg(stats.rms_mean).rename('rms')   * 1000
-    DD_std  = DD_grp['res'].agg(np.std).rename('std')   * 1000
-    DD = pd.concat([DD_mean,DD_std,DD_rms],axis=1)
-    DD.reset_index(inplace = True)
+    # the residuals are extracted once as an array, which is used for the
+    # threshold mask (no intermediate abs & boolean Series) and the stats
+    Res = DFin["res"].to_numpy()
+    bool_thres = np.abs(Res) < threshold
+    
+    # the residuals are converted in mm once, before the grouping
+    Res_mm = Res[bool_thres] * 1000
+
+    #### the keys are factorized as integer codes and, with the residuals, 
+    ## kept as contiguous arrays for the bincount-based stats
+    # only the key columns of the selected rows are extracted
+    DDkeys = DFin.loc[bool_thres,grpby_keys]
+    # NaN keys are dropped, like with groupby
+    bool_key = DDkeys.notna().all(axis=1).to_numpy()
+    DDkeys = DDkeys[bool_key]
+    Res_mm = np.ascontiguousarray(Res_mm[bool_key],dtype=np.float64)
+
+    if len(grpby_keys) == 1:
+        Codes, Keys = pd.factorize(DDkeys[grpby_keys[0]],sort=False)
+        Keys = pd.DataFrame({grpby_keys[0]:Keys})
+    else:
+        Codes, Keys = pd.MultiIndex.from_frame(DDkeys).factorize()
+        Keys = Keys.to_frame(index=False,name=grpby_keys)
+
+    Mean, Std, Rms = _grouped_stats_bincount(Codes,Res_mm,len(Keys))
+
+    DD = Keys.assign(mean=Mean,std=Std,rms=Rms)
+    DD = DD.astype({k:DFin[k].dtype for k in grpby_keys})
     
     return DD    
 